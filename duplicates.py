@@ -8,30 +8,92 @@ import argparse
 import csv
 import functools
 import hashlib
+import io
 import json
 import logging
+import mmap
+import os
 import re
+import sqlite3
+import stat
 import sys
+from collections import defaultdict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
 from enum import IntEnum, auto
 from pathlib import Path
-from typing import Iterable
+from types import ModuleType
+from typing import Callable, Hashable, Iterable, Optional
+
+# SHA-256 is dispatched by OpenSSL to the SHA-NI instructions where the CPU has them.
+# It's only used as a collision key, so skip OpenSSL's FIPS security-policy checks.
+file_hasher: Callable = functools.partial(hashlib.sha256, usedforsecurity=False)
+file_hasher_name = 'sha256'
+big_file_hasher: Callable = file_hasher
+try:
+    from blake3 import blake3
+    file_hasher = blake3
+    file_hasher_name = 'blake3'
+    # BLAKE3 is a tree hash: one big file can be hashed over several threads, to the same digest.
+    big_file_hasher = functools.partial(blake3, max_threads=blake3.AUTO)
+except ImportError:
+    pass
+
+
+def _set_hash_threads(threads: int) -> None:
+    """
+    Limit the threads BLAKE3 hashes each big file with: run in every pool worker,
+    so that the workers between them use about one thread per CPU rather than one each.
+    """
+    global big_file_hasher
+    if file_hasher_name == 'blake3':
+        big_file_hasher = functools.partial(file_hasher, max_threads=threads)
+
+
+def _digest(data: bytes) -> Hashable:
+    return file_hasher(data).digest()
+
+
+prefix_hasher: Callable[[bytes], Hashable] = _digest
+try:
+    # The prefix-hash only picks out candidates for full-file hashing, so needn't be cryptographic.
+    # Its int digest also makes for a cheap dict key.
+    from xxhash import xxh3_128_intdigest
+    prefix_hasher = xxh3_128_intdigest
+except ImportError:
+    pass
+
+re2_engine: Optional[ModuleType] = None
+try:
+    # RE2 matches in linear time, so a filter pattern can't backtrack catastrophically on long paths.
+    # Its \w, \d and \b are ASCII-only though, unlike re's, so it's opt-in: see --filter-re2.
+    import re2
+    re2_engine = re2
+except ImportError:
+    pass
 
 LOGGER = logging.getLogger(__file__)
 logging.basicConfig(level=logging.DEBUG)
 
 
 def _output_dupes_json(dupes: Iterable, out_stream):
-    json.dump(list(dupes), out_stream, indent=4)
+    """
+    Write the same layout as json.dump(dupes, indent=4), a group at a time.
+    json's indenting encoder is pure-Python, whereas encoding each path alone uses the C escaper.
+    """
+    separator = '[\n'
+    for dupe_list in dupes:
+        paths = ',\n        '.join(map(json.dumps, dupe_list))
+        out_stream.write(f'{separator}    [\n        {paths}\n    ]' if paths else f'{separator}    []')
+        separator = ',\n'
+
+    out_stream.write('[]' if separator == '[\n' else '\n]')
 
 
-def _output_dupes_csv(dupes: Iterable, out_stream):
-    dupes_list = list(dupes)
-    dupe_lengths = list(map(len, dupes_list))
-    dupes_with_counts = [[i[0]] + i[1] for i in list(zip(dupe_lengths, dupes_list))]
-    header = ['Count'] + ['Path'] * max(dupe_lengths)
+def _output_dupes_csv(dupes: list, out_stream):
+    header = ['Count'] + ['Path'] * max(map(len, dupes), default=0)
     csv_writer = csv.writer(out_stream)
     csv_writer.writerow(header)
-    csv_writer.writerows(dupes_with_counts)
+    csv_writer.writerows([len(i), *i] for i in dupes)
 
 
 def _output_plain(dupes: Iterable, out_stream):
@@ -54,7 +116,9 @@ def _output_dupes(dupes: list, out_file: Path, out_type: str):
 
 def _read_dupes_csv(in_file: Path):
     with in_file.open('r') as dupes_file:
-        return [i[1:] for i in csv.reader(dupes_file)][1:]
+        csv_reader = csv.reader(dupes_file)
+        next(csv_reader, None)  # Header
+        return [i[1:] for i in csv_reader]
 
 
 def _read_dupes_json(in_file: Path):
@@ -70,8 +134,13 @@ def _read_dupes(in_file: Path, in_type: str):
     return in_fn[in_type](in_file)
 
 
-MIN_SIZE = 1024
-MAX_SIZE = -1
+# One page: reading a 4K prefix costs no more I/O than reading 1K, and tells more files apart.
+MIN_SIZE = 4096
+STREAM_MIN_SIZE = 1024 * 1024
+MMAP_MIN_SIZE = 100 * 1024 * 1024
+# Per the XDG spec, an empty XDG_CACHE_HOME counts as unset.
+DEFAULT_HASH_CACHE = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                                  'duplicates', 'hashes.sqlite')
 
 
 class FileMetric(IntEnum):
@@ -79,9 +148,9 @@ class FileMetric(IntEnum):
     Different metrics for comparing files, ranging from fastest/least accurate to slowest/presumed-exact.
     """
     SIZE = auto()
-    HASH_1K = auto()
-    HASH_MD5 = auto()
-    MAX = HASH_MD5
+    HASH_PREFIX = auto()
+    HASH_FULL = auto()
+    MAX = HASH_FULL
     MIN = SIZE
 
     def next(self):
@@ -99,135 +168,303 @@ class FileMetric(IntEnum):
         return self.value if self.value == FileMetric.MIN else FileMetric(self.value - 1)
 
 
-def _file_size(file: Path):
-    return file.stat(follow_symlinks=False).st_size
+def _calc_prefix_hash(chunk_size: int, file: str, file_size: int) -> Hashable:
+    # A raw fd skips the fstat, isatty-ioctl and lseek that setting up a buffered file object costs,
+    # halving the syscalls for this pass, which is dominated by many small reads.
+    # Unlike a buffered read(n), os.read may return short (e.g. on FUSE/NFS), so read until full or EOF.
+    fd = os.open(file, os.O_RDONLY)
+    try:
+        chunk = os.read(fd, chunk_size)
+        while len(chunk) < chunk_size:
+            more = os.read(fd, chunk_size - len(chunk))
+            if not more:
+                break
 
+            chunk += more
+    finally:
+        os.close(fd)
 
-def _calc_md5_hash(chunk_size: int, file: Path):
-    with file.open('rb') as in_file:
-        return hashlib.md5(in_file.read(chunk_size)).hexdigest()
+    # A file which fits in the chunk gets its final, collision-proof, full-file hash here instead.
+    return file_hasher(chunk).digest() if file_size <= chunk_size else prefix_hasher(chunk)
 
 
-md5_cache = {}
+def _calc_large_hash(in_file: io.BufferedReader, file_size: int) -> bytes:
+    if file_size < MMAP_MIN_SIZE and hasattr(hashlib, 'file_digest'):
+        # Python 3.11+: hash through a single reusable buffer, filled and hashed in C.
+        return hashlib.file_digest(in_file, file_hasher).digest()
 
+    # Hash straight from the page-cache rather than copying the whole file into memory.
+    with mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            # Read ahead aggressively, and let pages go once they've been hashed.
+            mapped_file.madvise(mmap.MADV_SEQUENTIAL)
 
-def _md5_hash(chunk_size: int, file: Path):
-    if file in md5_cache:
-        return md5_cache[file]
+        return big_file_hasher(mapped_file).digest()
 
-    if chunk_size == -1 or chunk_size >= file.stat().st_size:
-        md5_hash = _calc_md5_hash(-1, file)
-        md5_cache[file] = md5_hash
-        return md5_hash
 
-    return _calc_md5_hash(chunk_size, file)
+def _calc_hash(file: str, file_size: int) -> bytes:
+    with open(file, 'rb') as in_file:
+        if file_size < STREAM_MIN_SIZE:
+            return file_hasher(in_file.read()).digest()
 
+        if not hasattr(os, 'posix_fadvise'):
+            return _calc_large_hash(in_file, file_size)
 
-metrics = {
-    FileMetric.SIZE: _file_size,
-    FileMetric.HASH_1K: functools.partial(_md5_hash, MIN_SIZE),
-    FileMetric.HASH_MD5: functools.partial(_md5_hash, MAX_SIZE),
-}
+        # Widen read-ahead while hashing, then drop the pages we read from the page-cache,
+        # rather than evicting what other processes are using for files we'll never read again.
+        os.posix_fadvise(in_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        try:
+            return _calc_large_hash(in_file, file_size)
+        finally:
+            os.posix_fadvise(in_file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
 
 
-class DupeFinder():
+def _regular_file_size(file: str) -> Optional[int]:
     """
-    Efficiently find duplicate files within a directory, comparing first by file-size,
-    then by first 1024-bytes' hash, and then by full MD5 hash, as necessary.
-    MD5 is apparently good enough for most comparisons (1 accidental collision every 10^29 or so).
+    Return the size of a regular file from a single lstat, or None for anything else.
     """
+    try:
+        file_stat = os.stat(file, follow_symlinks=False)
+    except OSError:
+        file_stat = None
 
-    def __init__(self, verbose: bool = False):
-        self.file_map = {}
-        self.verbose = verbose
+    if file_stat and stat.S_ISLNK(file_stat.st_mode):
+        LOGGER.warning('Ignoring - symlink: %s', file)
+        return None
+
+    if not file_stat or not stat.S_ISREG(file_stat.st_mode):
+        LOGGER.info('Ignoring - not a file: %s', file)
+        return None
 
-    def _insert_into_metric_map(self, metric: FileMetric, measure, file: Path):
-        if metric not in self.file_map:
-            self.file_map[metric] = {}
+    return file_stat.st_size
 
-        metric_map = self.file_map[metric]
-        if measure not in metric_map:
-            metric_map[measure] = []
 
-        similar_files = metric_map[measure]
-        similar_files.append(file)
+metrics: dict[FileMetric, Callable[[str, int], Hashable]] = {
+    FileMetric.HASH_PREFIX: functools.partial(_calc_prefix_hash, MIN_SIZE),
+    FileMetric.HASH_FULL: _calc_hash,
+}
 
-        return similar_files
 
-    def _lookup_dupes(self, file: Path, metric: FileMetric = FileMetric.MIN):
-        if file.is_symlink():
-            LOGGER.warning('Ignoring - symlink: %s', file)
-            return
+def _resolve_path_to_dir(root: str, path: str):
+    if os.path.isabs(path):
+        return path
 
-        if not file.is_file():
-            LOGGER.info('Ignoring - not a file: %s', file)
-            return
+    # As Path(root) / path did: drop '.' and empty components, but leave '..' for symlinks' sake.
+    return os.path.join(root, *(i for i in path.split(os.sep) if i not in ('', '.')))
 
-        measure = metrics[metric](file)
-        similar_files = self._insert_into_metric_map(metric, measure, file)
 
-        if len(similar_files) > 1:
-            if metric != FileMetric.MAX:
-                next_metric = metric.next()
-                if len(similar_files) == 2:
-                    self._lookup_dupes(similar_files[0], next_metric)
-                self._lookup_dupes(file, next_metric)
-
-    def _process_dupes(self, search_dirs: list[Path]):
-        for search_dir in search_dirs:
-            if search_dir.is_symlink():
-                LOGGER.warning('Ignoring - directory symlink: %s', search_dir)
-                continue
-
-            for i in search_dir.iterdir():
-                if i.is_dir():
-                    search_dirs.append(i)
+def _walk(search_dirs: list[str]) -> Iterable[tuple[str, int]]:
+    """
+    Lazily yield the path and size of each regular file beneath the search directories, breadth-first.
+    scandir entries cache the file-type from readdir, and their lstat result supplies each size,
+    so nothing is stat'ed twice. Symlinks are skipped rather than followed.
+    """
+    # Not abspath: that would collapse 'link/..' textually, rather than as the filesystem would.
+    cwd = os.getcwd()
+    pending_dirs = deque(_resolve_path_to_dir(cwd, i) for i in search_dirs)
+    while pending_dirs:
+        with os.scandir(pending_dirs.popleft()) as entries:
+            for entry in entries:
+                if entry.is_symlink():
+                    LOGGER.warning('Ignoring - symlink: %s', entry.path)
+                elif entry.is_dir(follow_symlinks=False):
+                    pending_dirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path, entry.stat(follow_symlinks=False).st_size
                 else:
-                    self._lookup_dupes(i)
+                    LOGGER.info('Ignoring - not a file: %s', entry.path)
+
+
+def _collisions(groups: dict) -> tuple[list[str], list[int]]:
+    """
+    Return the files, and their sizes, from each group of more than one file.
+    """
+    files = []
+    sizes = []
+    for similar_files in groups.values():
+        if len(similar_files) > 1:
+            for (file, size) in similar_files:
+                files.append(file)
+                sizes.append(size)
+
+    return files, sizes
+
+
+class HashCache():
+    """
+    Persist full-file hashes between runs, so that unchanged files needn't be read again on a rescan.
+    Entries are keyed by device and inode, and only used while the file's mtime and size still match.
+    """
 
-    def find_dupes(self, search_dirs: list[str]):
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS hashes (hasher TEXT, dev INTEGER, ino INTEGER, '
+                                'mtime_ns INTEGER, size INTEGER, hash BLOB, PRIMARY KEY (hasher, dev, ino))')
+
+    def _lookup(self, file_stat: os.stat_result) -> Optional[bytes]:
+        row = self.connection.execute(
+            'SELECT hash FROM hashes WHERE hasher = ? AND dev = ? AND ino = ? AND mtime_ns = ? AND size = ?',
+            (file_hasher_name, file_stat.st_dev, file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size)
+        ).fetchone()
+        return row[0] if row else None
+
+    def hash_files(self, hash_fn: Callable, files: list[str], sizes: list[int]) -> list:
         """
-        Find duplicate files within our defined search directories.
+        Return the hash of each file: from the cache where still valid, else from hash_fn(files, sizes).
         """
-        search_dirs = [Path(i) for i in search_dirs]
+        file_stats = [os.stat(i, follow_symlinks=False) for i in files]
+        hashes = [self._lookup(i) for i in file_stats]
+        misses = [i for (i, file_hash) in enumerate(hashes) if file_hash is None]
+
+        new_hashes = hash_fn([files[i] for i in misses], [sizes[i] for i in misses])
+        with self.connection:
+            for i, file_hash in zip(misses, new_hashes):
+                hashes[i] = file_hash
+                file_stat = file_stats[i]
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)',
+                    (file_hasher_name, file_stat.st_dev, file_stat.st_ino, file_stat.st_mtime_ns,
+                     file_stat.st_size, file_hash))
+
+        return hashes
+
+
+class DupeFinder():
+    """
+    Efficiently find duplicate files within a directory, comparing first by file-size,
+    then by first 4096-bytes' hash (xxHash when available), and then by full-file hash, as necessary.
+    The hash is BLAKE3 when available, else SHA-256: both are SIMD/SHA-NI accelerated,
+    unlike MD5, and neither will collide accidentally.
+    """
+
+    def __init__(self, verbose: bool = False, max_workers: Optional[int] = None, resolve_paths: bool = False,
+                 hash_cache: Optional[str] = None):
+        self.file_map: dict[FileMetric, dict[Hashable, list[tuple[str, int]]]] = {}
+        self.verbose = verbose
+        self.max_workers: int = max_workers or os.cpu_count() or 1
+        self.resolve_paths = resolve_paths
+        self.hash_cache = HashCache(hash_cache) if hash_cache else None
+
+    def _group_by(self, metric: FileMetric, files: list[str], sizes: list[int], measures: Iterable) -> dict:
+        groups: dict[Hashable, list[tuple[str, int]]] = defaultdict(list)
+        for measure, file, size in zip(measures, files, sizes):
+            groups[measure].append((file, size))
+
+        self.file_map[metric] = groups
+        return groups
+
+    def _group_by_hash(self, executor: Executor, metric: FileMetric, groups: dict) -> dict:
+        files, sizes = _collisions(groups)
+        if self.verbose:
+            LOGGER.debug('%s: %d of %d files are candidates; the rest are already unique',
+                         metric.name, len(files), sum(map(len, groups.values())))
+
+        hash_fn = functools.partial(self._hash_files, executor, metric)
+        hashes: Iterable
+        if metric == FileMetric.HASH_FULL and self.hash_cache:
+            hashes = self.hash_cache.hash_files(hash_fn, files, sizes)
+        else:
+            hashes = hash_fn(files, sizes)
+
+        return self._group_by(metric, files, sizes, zip(sizes, hashes))
 
+    def _hash_files(self, executor: Executor, metric: FileMetric, files: list[str], sizes: list[int]) -> Iterable:
+        if self.verbose:
+            # After any hash-cache hits have been taken out.
+            LOGGER.debug('%s: hashing %d files', metric.name, len(files))
+
+        # Hand out files in batches: a future per file costs more than hashing most of them.
+        chunksize = max(1, len(files) // (self.max_workers * 4))
+        return executor.map(metrics[metric], files, sizes, chunksize=chunksize)
+
+    def _process_files(self, files: list[str], sizes: list[int]) -> None:
+        """
+        Group files by size, then by prefix-hash, then by full-file hash: each pass only measures
+        the files which collided on the previous one, so the working set shrinks rapidly.
+        Hashing is spread over a process pool, so the per-file Python work scales with cores too,
+        not just the hashing itself. The file_map is only ever updated in this process.
+        Sizes come from the directory walk and are carried through, so no file is stat'ed twice,
+        except that the hash cache re-stats full-hash candidates, to check they're unchanged;
+        hash groups are keyed by (size, hash) so files of different sizes never share a group.
+        """
+        size_groups = self._group_by(FileMetric.SIZE, files, sizes, sizes)
+        hash_threads = max(1, (os.cpu_count() or 1) // self.max_workers)
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_set_hash_threads,
+                                 initargs=(hash_threads,)) as executor:
+            prefix_groups = self._group_by_hash(executor, FileMetric.HASH_PREFIX, size_groups)
+
+            # Files of up to MIN_SIZE bytes were hashed whole by the prefix pass: don't read them again.
+            small_groups = {k: v for (k, v) in prefix_groups.items() if k[0] <= MIN_SIZE}
+            large_groups = {k: v for (k, v) in prefix_groups.items() if k[0] > MIN_SIZE}
+            self._group_by_hash(executor, FileMetric.HASH_FULL, large_groups).update(small_groups)
+
+    def _process_dupes(self, search_dirs: list[str]) -> None:
+        files = []
+        sizes = []
+        for file, size in _walk(search_dirs):
+            files.append(file)
+            sizes.append(size)
+
+        self._process_files(files, sizes)
+
+    def find_dupes(self, search_dirs: list[str]) -> list[list[str]]:
+        """
+        Find duplicate files within our defined search directories.
+        """
         for path in search_dirs:
-            assert path.is_dir() and not path.is_symlink(), f'{path} must be a non-symlink directory'
+            assert os.path.isdir(path) and not os.path.islink(path), f'{path} must be a non-symlink directory'
 
         self._process_dupes(search_dirs)
         return self.dupes
 
-    def rescan(self, old_dupes: list[list]):
+    def rescan(self, old_dupes: list[list]) -> list[list[str]]:
         """
         Rescan an existing set of duplicate files.
         """
-        for dupe_set in old_dupes:
-            for i in dupe_set:
-                self._lookup_dupes(Path(i))
-
+        files = []
+        sizes = []
+        cwd = os.getcwd()
+        for i in (_resolve_path_to_dir(cwd, i) for dupe_set in old_dupes for i in dupe_set):
+            size = _regular_file_size(i)
+            if size is not None:
+                files.append(i)
+                sizes.append(size)
+
+        self._process_files(files, sizes)
         return self.dupes
 
     @property
-    def dupes(self):
+    def dupes(self) -> list[list[str]]:
         """
-        Return a list of duplicate-list absolute Paths.
+        Return a list of duplicate-list absolute paths.
+        Paths are made absolute as they're found, so symlinks are only resolved if requested:
+        that costs a syscall per path component.
         """
         dupes_map = self.file_map.get(FileMetric.MAX, {})
-        return [[str(i.resolve()) for i in v] for (_, v) in dupes_map.items()]
+        path_fn = os.path.realpath if self.resolve_paths else str
+        return [[path_fn(i) for (i, _) in v] for v in dupes_map.values() if len(v) > 1]
 
 
-def _filter(dupes: list, pattern: str):
-    filtered = []
-    for row in dupes:
-        filtered_row = [i for i in row if re.search(pattern, i)]
-        if filtered_row:
-            filtered.append(filtered_row)
+def _compile_pattern(pattern: str, use_re2: bool):
+    if not use_re2:
+        return re.compile(pattern)
 
-    return filtered
+    if not re2_engine:
+        LOGGER.warning('google-re2 is not installed: filtering with re')
+        return re.compile(pattern)
 
+    try:
+        return re2_engine.compile(pattern)
+    except re2_engine.error:
+        # RE2 lacks some constructs, e.g. backreferences: let re have a go at those.
+        return re.compile(pattern)
 
-def _resolve_path_to_dir(root: str, path: str):
-    return path if Path(path).is_absolute() else Path(root) / path
+
+def _filter(dupes: list, pattern: str, use_re2: bool = False):
+    search = _compile_pattern(pattern, use_re2).search
+    filtered_rows = ([i for i in row if search(i)] for row in dupes)
+    return [i for i in filtered_rows if i]
 
 
 def _resolve_to_cwd(dupes: list):
@@ -237,14 +474,16 @@ def _resolve_to_cwd(dupes: list):
     This does _not_ do 'true' resolve in the same way as Path.resolve() et al,
     as we wish to leave any symlinks untouched.
     """
-    cwd = Path.cwd()
-    resolved = []
-    for row in dupes:
-        resolved_row = [str(_resolve_path_to_dir(cwd, i)) for i in row]
-        if resolved_row:
-            resolved.append(resolved_row)
+    cwd = os.getcwd()
+    return [[_resolve_path_to_dir(cwd, i) for i in row] for row in dupes if row]
+
 
-    return resolved
+def _positive_int(value: str) -> int:
+    count = int(value)
+    if count < 1:
+        raise argparse.ArgumentTypeError(f'{value} is not a positive integer')
+
+    return count
 
 
 def _parse_args():
@@ -258,8 +497,17 @@ def _parse_args():
     parser.add_argument('--out-type', '-ot', help='Output file type (default: PLAIN)',
                         choices=['CSV', 'JSON', 'PLAIN'], default='PLAIN')
     parser.add_argument('--filter-pattern', '-f', help='Filter pattern regex', default=None)
+    parser.add_argument('--filter-re2', help='Match the filter pattern with RE2, if the optional google-re2 package '
+                        'is installed (linear-time, but its \\w, \\d and \\b are ASCII-only)',
+                        action=argparse.BooleanOptionalAction, default=False)
     parser.add_argument('--rescan', '-r', help='Rescan items from input-file',
                         action=argparse.BooleanOptionalAction, default=False)
+    parser.add_argument('--jobs', '-j', type=_positive_int, default=None,
+                        help='Number of files to hash in parallel (default: CPU count)')
+    parser.add_argument('--hash-cache', nargs='?', const=DEFAULT_HASH_CACHE, default=None,
+                        help=f'Reuse hashes of unchanged files across runs (default: {DEFAULT_HASH_CACHE})')
+    parser.add_argument('--resolve-paths', help='Resolve symlinks in the output paths of a scan',
+                        action=argparse.BooleanOptionalAction, default=False)
     parser.add_argument('--verbose', '-v', help='Verbose output - e.g. print each processed file',
                         action=argparse.BooleanOptionalAction, default=False)
     return parser.parse_args()
@@ -281,6 +529,8 @@ def main():
     def resolve_fn(i):
         return i
 
+    dupe_finder = DupeFinder(verbose=args.verbose, max_workers=args.jobs, resolve_paths=args.resolve_paths,
+                             hash_cache=args.hash_cache)
     dupes = None
     if args.in_file:
         old_dupes = _read_dupes(Path(args.in_file), args.in_type)
@@ -288,12 +538,12 @@ def main():
             dupes = old_dupes
             resolve_fn = _resolve_to_cwd
         else:
-            dupes = DupeFinder(verbose=args.verbose).rescan(old_dupes)
+            dupes = dupe_finder.rescan(old_dupes)
     else:
-        dupes = DupeFinder(verbose=args.verbose).find_dupes(args.search_dir)
+        dupes = dupe_finder.find_dupes(args.search_dir)
 
     # Inefficient. But there are other inefficiencies: let's see if this is good enough.
-    filtered_dupes = _filter(dupes, args.filter_pattern) if args.filter_pattern else dupes
+    filtered_dupes = _filter(dupes, args.filter_pattern, args.filter_re2) if args.filter_pattern else dupes
     resolved_dupes = resolve_fn(filtered_dupes)
 
     _output_dupes(resolved_dupes, out_file, args.out_type)